@@ -3,14 +3,20 @@ import yaml
 
 """ Configuration file."""
 
+import functools
 import os
 import os.path as osp
+import pickle
+import tempfile
 
 import sys
+from types import SimpleNamespace
 from easydict import EasyDict as edict
 
 from enum import Enum
-import pdb
+
+# Prefer the libyaml-backed loader when PyYAML was built against it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class phase(Enum):
@@ -20,7 +26,36 @@ class phase(Enum):
     TRAINVAL = "train-val"
 
 
-__C = edict()
+class _LazyEdict(edict):
+    """edict whose expensive entries (see _LAZY_ENTRIES) are computed on first access."""
+
+    def __init__(self, d=None, **kwargs):
+        # Unlike edict.__init__, don't copy class attributes in as entries (that would store get() in the dict)
+        for k, v in dict(d or {}, **kwargs).items():
+            setattr(self, k, v)
+
+    def __getattr__(self, name):
+        loader = _LAZY_ENTRIES.get(name)
+        if loader is None:
+            raise AttributeError(name)
+        setattr(self, name, loader())
+        return self[name]
+
+    def __missing__(self, key):
+        if key not in _LAZY_ENTRIES:
+            raise KeyError(key)
+        return self.__getattr__(key)
+
+    def __contains__(self, key):
+        return key in _LAZY_ENTRIES or super().__contains__(key)
+
+    def get(self, key, default=None):
+        if key in _LAZY_ENTRIES:
+            return self[key]
+        return super().get(key, default)
+
+
+__C = _LazyEdict()
 
 # Public access to configuration settings
 cfg = __C
@@ -79,10 +114,27 @@ __C.EVAL.METRICS = ["J", "F"]
 __C.EVAL.STATISTICS = ["mean", "recall", "decay"]
 
 
+def _to_namespace(obj):
+    """Recursively copy parsed YAML, turning dicts into SimpleNamespace."""
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [_to_namespace(v) for v in obj]
+    return obj
+
+
+@functools.lru_cache(maxsize=1)
+def _db_load_info(path, mtime_ns, size):
+    """Parse dataset properties file. Memoized on (path, mtime, size)."""
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
 def db_read_info():
     """Read dataset properties from file."""
-    with open(cfg.FILES.DB_INFO, "r") as f:
-        return edict(yaml.load(f))
+    st = os.stat(cfg.FILES.DB_INFO)
+    # A fresh copy per call, so callers never mutate the cached parse.
+    return _to_namespace(_db_load_info(cfg.FILES.DB_INFO, st.st_mtime_ns, st.st_size))
 
 
 def db_read_attributes():
@@ -97,7 +149,6 @@ def db_read_years():
 
 def db_read_sequences(year=None, db_phase=None):
     """Read list of sequences."""
-    # pdb.set_trace()
     sequences = db_read_info().sequences
 
     if year is not None:
@@ -107,15 +158,71 @@ def db_read_sequences(year=None, db_phase=None):
         if db_phase == phase.TRAINVAL:
             sequences = filter(lambda s: ((s.set == phase.VAL) or (s.set == phase.TRAIN)), sequences)
         else:
-            sequences = filter(
-                lambda s: s.set == db_phase and osp.isdir(osp.join(__C.PATH.SEQUENCES, s.name)), sequences
-            )
+            # One directory listing instead of an isdir() per candidate sequence.
+            root = __C.PATH.SEQUENCES
+            present = {e.name for e in os.scandir(root) if e.is_dir()} if osp.isdir(root) else set()
+            sequences = [s for s in sequences if s.set == db_phase and s.name in present]
     return sequences
 
 
-# Load all sequences
-__C.SEQUENCES = dict([(sequence.name, sequence) for sequence in db_read_sequences()])
-
 import numpy as np
 
-__C.palette = np.loadtxt(__C.PATH.PALETTE, dtype=np.uint8).reshape(-1, 3)
+# Bump whenever the type of the pickled sequences changes, so stale caches are rebuilt.
+_SEQUENCES_CACHE_VERSION = 2
+
+
+def _write_cache(path, dump):
+    """Write a cache file through a temp file in the same folder, so readers never see a partial file."""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=osp.dirname(path), prefix=osp.basename(path) + ".")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            dump(f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _load_sequences_cached(info_path):
+    """Read all sequences, cached next to the property file as a pickle keyed on its mtime and size."""
+    pkl_path = info_path + ".pkl"
+    st = os.stat(info_path)
+    key = (_SEQUENCES_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    try:
+        with open(pkl_path, "rb") as f:
+            cached_key, sequences = pickle.load(f)
+        if cached_key == key:
+            return sequences
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass
+
+    sequences = {s.name: s for s in db_read_sequences()}
+    _write_cache(pkl_path, lambda f: pickle.dump((key, sequences), f, protocol=pickle.HIGHEST_PROTOCOL))
+    return sequences
+
+
+def _load_palette_cached(txt_path):
+    """Read color palette, cached next to the text file as .npy while newer than the source."""
+    npy_path = txt_path + ".npy"
+    try:
+        if os.stat(npy_path).st_mtime >= os.stat(txt_path).st_mtime:
+            return np.load(npy_path)
+    except (OSError, EOFError, ValueError):
+        pass
+
+    palette = np.loadtxt(txt_path, dtype=np.uint8).reshape(-1, 3)
+    _write_cache(npy_path, lambda f: np.save(f, palette))
+    return palette
+
+
+# All sequences and color palette, loaded on first access of cfg.SEQUENCES / cfg.palette
+_LAZY_ENTRIES = {
+    "SEQUENCES": lambda: _load_sequences_cached(__C.FILES.DB_INFO),
+    "palette": lambda: _load_palette_cached(__C.PATH.PALETTE),
+}
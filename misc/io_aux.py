@@ -15,9 +15,12 @@ def imread_indexed(filename):
     )
 
 
-def imwrite_indexed(filename, array, color_palette=cfg.palette):
+def imwrite_indexed(filename, array, color_palette=None):
     """Save indexed png."""
 
+    if color_palette is None:
+        color_palette = cfg.palette
+
     if np.atleast_3d(array).shape[2] != 1:
         raise Exception("Saving indexed PNGs requires 2D array.")
 
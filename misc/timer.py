@@ -6,16 +6,24 @@ import time
 
 
 class Timer(object):
-    """docstring for Timer"""
+    """Interval timer based on time.perf_counter. Also usable as `with Timer() as t: ...`, then `t.elapsed`."""
 
     def __init__(self):
         super(Timer, self).__init__()
         self._start = None
+        self.elapsed = None
 
     def tic(self):
-        self._start = time.time()
+        self._start = time.perf_counter()
         return self
 
     def toc(self):
-        assert self._start != None, 'Timer uninitialized. Call "toc()" first.'
-        return time.time() - self._start
+        assert self._start != None, 'Timer uninitialized. Call "tic()" first.'
+        return time.perf_counter() - self._start
+
+    def __enter__(self):
+        return self.tic()
+
+    def __exit__(self, *exc_info):
+        self.elapsed = self.toc()
+        return False
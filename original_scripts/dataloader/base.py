@@ -1,6 +1,9 @@
+import fnmatch
 import functools
+import os
 import os.path as osp
 
+import lmdb
 import numpy as np
 
 from PIL import Image
@@ -8,7 +11,6 @@ from skimage.io import ImageCollection
 
 from misc.config import cfg, phase
 from misc.io_aux import imread_indexed, imwrite_indexed
-import pdb
 
 #################################
 # HELPER FUNCTIONS
@@ -26,6 +28,43 @@ def _load_annotation(filename, single_object):
     return annotation
 
 
+def _list_files(path, regex):
+    """Sorted names of the files in a folder matching a glob pattern, from a single directory scan."""
+    try:
+        # Like glob, hidden files (e.g. macOS '._00000.png') never match
+        return sorted(
+            e.name for e in os.scandir(path) if not e.name.startswith(".") and fnmatch.fnmatch(e.name, regex)
+        )
+    except FileNotFoundError:
+        return []
+
+
+def open_lmdb(path):
+    """Open a dataset LMDB read-only. The caller closes it once done."""
+    # Lock-free read-only access lets many processes read the env at once. Frames are
+    # sampled in random order, so OS readahead only wastes page cache.
+    return lmdb.open(
+        path,
+        readonly=True,
+        lock=False,
+        readahead=False,
+        meminit=False,
+        max_readers=max(cfg.N_JOBS * 4, 128),
+    )
+
+
+def first_png_stem(path):
+    """Smallest frame number among the '<frame>.png' files in a folder (dotfiles skipped, like glob)."""
+    return min(
+        int(e.name[:-4]) for e in os.scandir(path) if e.name.endswith(".png") and not e.name.startswith(".")
+    )
+
+
+def frame_numbers(files):
+    """Frame numbers of '<frame>.png' style paths (str or bytes)."""
+    return [int(osp.basename(f)[:-4]) for f in files]
+
+
 def _get_num_objects(annotation):
     """Count number of objects from segmentation mask"""
     ids = sorted(np.unique(annotation))
@@ -62,9 +101,10 @@ class BaseLoader(ImageCollection):
             with lmdb_env.begin() as txn:
                 _files_vec = txn.get(key_db.encode()).decode().split("|")
                 _files = [bytes(osp.join(path, f).encode()) for f in _files_vec]
-            super(BaseLoader, self).__init__(_files, load_func=load_func)
         else:
-            super(BaseLoader, self).__init__(osp.join(path + "/" + regex), load_func=load_func)
+            # str paths, as the glob pattern gave: skimage>=0.19 rejects a bytes list when load_func is None
+            _files = [osp.join(path, f) for f in _list_files(path, regex)]
+        super(BaseLoader, self).__init__(_files, load_func=load_func)
 
         # Sequence name
         self.name = osp.basename(path)
@@ -153,7 +193,6 @@ class Segmentation(BaseLoader):
             functools.partial(_load_annotation, single_object=single_object),
             lmdb_env=lmdb_env,
         )
-        # pdb.set_trace()
         try:
             self.n_objects = _get_num_objects(self[0])
         except:
@@ -11,6 +11,7 @@
 ########################################################################
 
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
@@ -24,15 +25,14 @@ from .base import (
     Segmentation,
     SequenceClip_simple,
     AnnotationClip_simple,
+    open_lmdb,
+    first_png_stem,
+    frame_numbers,
 )
 from misc.config import cfg, phase, db_read_sequences
 from .transforms.transforms import RandomAffine
 
-from easydict import EasyDict as edict
-import lmdb
 import os.path as osp
-import time
-import glob
 from .dataset import MyDataset
 
 
@@ -123,92 +123,77 @@ class DAVISLoader(MyDataset):
         if self._single_object and self._year != "2016":
             raise Exception("Single object segmentation only available for 'year=2016'")
 
-        self._db_sequences = db_read_sequences(args.year, self._phase)
+        # Materialized once: db_read_sequences returns a one-shot iterator and the
+        # list is walked several times below (and indexed by sequence_id_to_name).
+        self._db_sequences = list(db_read_sequences(args.year, self._phase))
 
         # Check lmdb existance. If not proceed with standard dataloader.
         lmdb_env_seq_dir = osp.join(cfg.PATH.DATA, "lmdb_seq")
         lmdb_env_annot_dir = osp.join(cfg.PATH.DATA, "lmdb_annot")
 
         if osp.isdir(lmdb_env_seq_dir) and osp.isdir(lmdb_env_annot_dir):
-            lmdb_env_seq = lmdb.open(lmdb_env_seq_dir)
-            lmdb_env_annot = lmdb.open(lmdb_env_annot_dir)
+            lmdb_env_seq = open_lmdb(lmdb_env_seq_dir)
+            lmdb_env_annot = open_lmdb(lmdb_env_annot_dir)
         else:
             lmdb_env_seq = None
             lmdb_env_annot = None
             print("LMDB not found. This could affect the data loading time. It is recommended to use LMDB.")
 
-        # Load sequences
-        # self.sequences = [Sequence(self._phase, s.name, lmdb_env=lmdb_env_seq) for s in self._db_sequences]
-
-        self.sequences = [
-            Sequence(self._phase, s.name, regex="*.png", lmdb_env=lmdb_env_seq) for s in self._db_sequences
-        ]
-        self._db_sequences = db_read_sequences(args.year, self._phase)
-
-        # Load annotations
-        self.annotations = [
-            Annotation(self._phase, s.name, self._single_object, lmdb_env=lmdb_env_annot)
-            for s in self._db_sequences
-        ]
+        # Hoisted out of the per-sequence loops below
+        annot_root = cfg.PATH.ANNOTATIONS
+        length_clip = self._length_clip
 
-        # Load sequences
-        self.sequence_clips = []
+        def load_sequence(s):
+            return Sequence(split, s.name, regex="*.png", lmdb_env=lmdb_env_seq)
 
-        self._db_sequences = db_read_sequences(args.year, self._phase)
-        for seq, s in zip(self.sequences, self._db_sequences):
-            if self.use_prev_mask == False:
-                images = seq.files
+        def load_annotation(s):
+            return Annotation(split, s.name, self._single_object, lmdb_env=lmdb_env_annot)
 
-                starting_frame_idx = 0
+        def load_first_annotated_clip(s):
+            # We only consider the first frame annotated to start the inference mode with such a frame
+            starting_frame = first_png_stem(osp.join(annot_root, s.name))
+            return SequenceClip(split, s.name, starting_frame, regex="*.png", lmdb_env=lmdb_env_seq)
 
-                starting_frame = int(osp.splitext(osp.basename(images[starting_frame_idx]))[0])
+        # Construction is dominated by directory listings and file reads, so it is spread over
+        # threads (the GIL is released during I/O). map() keeps the order of _db_sequences.
+        try:
+            with ThreadPoolExecutor(max_workers=cfg.N_JOBS) as pool:
+                # Load sequences
+                self.sequences = list(pool.map(load_sequence, self._db_sequences))
+
+                # Load annotations
+                self.annotations = list(pool.map(load_annotation, self._db_sequences))
+
+                if self.use_prev_mask:
+                    self.sequence_clips = list(pool.map(load_first_annotated_clip, self._db_sequences))
+        finally:
+            # The envs are only read above to list files. Keeping them would make the loader
+            # unpicklable and leak open envs into forked DataLoader workers.
+            for env in (lmdb_env_seq, lmdb_env_annot):
+                if env is not None:
+                    env.close()
 
-                self.sequence_clips.append(SequenceClip_simple(seq, starting_frame))
-                num_frames = self.sequence_clips[-1]._numframes
-                num_clips = int(num_frames / self._length_clip)
+        # Load sequences
+        if not self.use_prev_mask:
+            self.sequence_clips = []
+            for seq in self.sequences:
+                num_clips = max(int(seq._numframes / length_clip), 1)
 
-                for idx in range(num_clips - 1):
-                    starting_frame_idx += self._length_clip
-                    starting_frame = int(osp.splitext(osp.basename(images[starting_frame_idx]))[0])
+                # Only the first file of each clip is parsed
+                for starting_frame in frame_numbers(seq.files[: num_clips * length_clip : length_clip]):
                     self.sequence_clips.append(SequenceClip_simple(seq, starting_frame))
 
-            else:
-                annot_seq_dir = osp.join(cfg.PATH.ANNOTATIONS, s.name)
-
-                annotations = glob.glob(osp.join(annot_seq_dir, "*.png"))
-                annotations.sort()
-                # We only consider the first frame annotated to start the inference mode with such a frame
-                # starting_frame = int(osp.splitext(osp.basename(annotations[1]))[0])
-                starting_frame = int(osp.splitext(osp.basename(annotations[0]))[0])
-                # self.sequence_clips.append(SequenceClip(self._phase, s.name, starting_frame, lmdb_env=lmdb_env_seq))
-                self.sequence_clips.append(
-                    SequenceClip(self._phase, s.name, starting_frame, regex="*.png", lmdb_env=lmdb_env_seq)
-                )
-
         # Load annotations
         self.annotation_clips = []
-        self._db_sequences = db_read_sequences(args.year, self._phase)
-        for annot, s in zip(self.annotations, self._db_sequences):
-            images = annot.files
-            starting_frame_idx = 0
-            starting_frame = int(osp.splitext(osp.basename(images[starting_frame_idx]))[0])
-
-            self.annotation_clips.append(AnnotationClip_simple(annot, starting_frame))
-            num_frames = self.annotation_clips[-1]._numframes
-            num_clips = int(num_frames / self._length_clip)
-
-            for idx in range(num_clips - 1):
-                starting_frame_idx += self._length_clip
-                starting_frame = int(osp.splitext(osp.basename(images[starting_frame_idx]))[0])
+        for annot in self.annotations:
+            num_clips = max(int(annot._numframes / length_clip), 1)
+
+            for starting_frame in frame_numbers(annot.files[: num_clips * length_clip : length_clip]):
                 self.annotation_clips.append(AnnotationClip_simple(annot, starting_frame))
 
-        self._keys = dict(zip([s for s in self.sequences], range(len(self.sequences))))
+        self._keys = {s: i for i, s in enumerate(self.sequences)}
 
-        self._keys_clips = dict(
-            zip(
-                [s.name + str(s.starting_frame) for s in self.sequence_clips], range(len(self.sequence_clips))
-            )
-        )
+        self._keys_clips = {f"{s.name}{s.starting_frame}": i for i, s in enumerate(self.sequence_clips)}
 
         try:
             self.color_palette = np.array(Image.open(self.annotations[0].files[0]).getpalette()).reshape(
@@ -226,7 +211,7 @@ class DAVISLoader(MyDataset):
         else:
             raise InputError()
 
-        return edict({"images": self.sequences[sid], "annotations": self.annotations[sid]})
+        return {"images": self.sequences[sid], "annotations": self.annotations[sid]}
 
     def get_raw_sample_clip(self, key):
         """Get sequences and annotations pairs."""
@@ -237,7 +222,7 @@ class DAVISLoader(MyDataset):
         else:
             raise InputError()
 
-        return edict({"images": self.sequence_clips[sid], "annotations": self.annotation_clips[sid]})
+        return {"images": self.sequence_clips[sid], "annotations": self.annotation_clips[sid]}
 
     def sequence_name_to_id(self, name):
         """Map sequence name to index."""
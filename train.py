@@ -1,8 +1,7 @@
 import os
-import rich
+import copy
 import argparse
 import yaml
-import wandb
 import pandas as pd
 
 import torch
@@ -24,6 +23,20 @@ parser = argparse.ArgumentParser()
 ds_root_dir = "/media/nas2/videofact2_data"
 ds_metadata_path = f"{ds_root_dir}/metadata.csv"
 
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_yaml_cache: dict[str, tuple[int, int, dict]] = {}
+
+
+def load_config(path: str) -> dict[str, Any]:
+    st = os.stat(path)
+    cached = _yaml_cache.get(path)
+    if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+        with open(path, "r") as f:
+            cached = (st.st_mtime_ns, st.st_size, yaml.load(f, Loader=_YAML_LOADER))
+        _yaml_cache[path] = cached
+    # callers get their own copy so edits never leak into the cache
+    return copy.deepcopy(cached[2])
+
 
 def prepare_model(args: dict[str, Any]) -> VIDNetPLWrapper:
     if args is None:
@@ -65,6 +78,8 @@ def prepare_logger(args: dict[str, Any]) -> Tuple[Optional[Union[WandbLogger, Te
         wandb_path = f"{log_path}/wandb"
         if not os.path.exists(wandb_path):
             os.makedirs(wandb_path)
+        import wandb
+
         run_uid = args_uid if args_uid else wandb.util.generate_id()
         logger = WandbLogger(
             project="vidnet",
@@ -79,6 +94,11 @@ def prepare_logger(args: dict[str, Any]) -> Tuple[Optional[Union[WandbLogger, Te
 
 
 def train(args: argparse.Namespace) -> None:
+    if not args.fast_dev_run:
+        # benchmark autotunes conv algorithms per input shape, so it only pays off with fixed clip/frame sizes.
+        # TF32 needs no switch here: matmuls get it from set_float32_matmul_precision and cuDNN allows it by default.
+        torch.backends.cudnn.benchmark = True
+
     # define how the model is loaded in the prepare_model.py file
     model = prepare_model(args.__dict__)
     logger, log_path = prepare_logger(args.__dict__)
@@ -126,11 +146,12 @@ def parse_args(args: argparse.Namespace) -> argparse.Namespace:
     if args.resume and not args.prev_ckpt:
         raise ValueError("resume is true but there's no checkpoint specified")
 
-    with open(args.config, "r") as f:
-        config = yaml.safe_load(f)
-        args.model_args = config["model_args"]
-        args.training_args = config["training_args"]
-        args.max_epochs = config["training_args"]["max_epochs"]
+    config = load_config(args.config)
+    args.model_args = config["model_args"]
+    args.training_args = config["training_args"]
+    args.max_epochs = config["training_args"]["max_epochs"]
+
+    import rich
 
     rich.print_json(data=args.__dict__)
     return args